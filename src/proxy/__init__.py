@@ -1,11 +1,36 @@
 """Top‑level package for the Python proxy server.
 
 Exposes common classes so that they can be imported directly from
-`proxy`, e.g. `from proxy.server import ProxyServer`.
+`proxy`, e.g. `from proxy import ProxyServer`.  The submodules are only
+imported when one of these names is first accessed, so entry points
+such as `python -m proxy.shell` do not load the server.
 """
 
-from .server import ProxyServer
-from .plugin_manager import PluginManager
-from .plugin_base import BasePlugin, HTTPRequest
+from __future__ import annotations
 
-__all__ = ["ProxyServer", "PluginManager", "BasePlugin", "HTTPRequest"]
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .server import ProxyServer
+    from .plugin_manager import PluginManager
+    from .plugin_base import BasePlugin, HTTPRequest
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "ProxyServer": ".server",
+    "PluginManager": ".plugin_manager",
+    "BasePlugin": ".plugin_base",
+    "HTTPRequest": ".plugin_base",
+}
+
+__all__ = ["ProxyServer", "PluginManager", "BasePlugin", "HTTPRequest"]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,5 @@
+"""Run the interactive firewall shell with ``python -m proxy``."""
+
+from .shell import main
+
+main()
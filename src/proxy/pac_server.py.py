@@ -1,9 +1,17 @@
 # pac_server.py
+import asyncio
+import gzip
+import hashlib
 import ipaddress
-import http.server
-import socketserver
+import json
+import socket
 from typing import List, Dict
 
+try:
+    import uvloop  # optional
+except ImportError:
+    uvloop = None
+
 # Define your routing rules here
 CONFIG: Dict[str, List] = {
     # Domains to bypass (direct connection)
@@ -20,29 +28,72 @@ CONFIG: Dict[str, List] = {
     "default_proxy": "PROXY  192.168.50.115:8443; DIRECT",
 }
 
+# Walks the host's labels TLD first through DIRECT_TRIE.  A "$sub" marker
+# matches any strictly deeper host (dnsDomainIs on ".example.com"), an
+# "$end" marker matches the exact host ("example.com").
+IS_DIRECT_JS = """\
+    function isDirect(host) {
+      var p = host.split(".").reverse();
+      var n = DIRECT_TRIE;
+      for (var i = 0; i < p.length; i++) {
+        if (!Object.prototype.hasOwnProperty.call(n, p[i])) return false;
+        n = n[p[i]];
+        if (n["$sub"] && i < p.length - 1) return true;
+      }
+      return !!n["$end"];
+    }
+"""
+
+# Tests IP-literal hosts against SUBNETS with integer masks, avoiding the
+# DNS lookup that isInNet() performs.  JS bitwise results are signed, so
+# ">>> 0" brings them back to the unsigned values in SUBNETS.
+SUBNET_JS = """\
+    function ipToInt(ip) {
+      var o = ip.split(".");
+      return ((o[0] << 24) | (o[1] << 16) | (o[2] << 8) | o[3]) >>> 0;
+    }
+    function inDirectSubnet(ip) {
+      var n = ipToInt(ip);
+      for (var i = 0; i < SUBNETS.length; i++) {
+        if (((n & SUBNETS[i][1]) >>> 0) === SUBNETS[i][0]) return true;
+      }
+      return false;
+    }
+"""
+
+IP_LITERAL_RE = r"/^\d+\.\d+\.\d+\.\d+$/"
+
+def build_domain_trie(domains: List[str]) -> Dict:
+    """Build a nested dict of reversed host labels for ``isDirect``."""
+    trie: Dict = {}
+    for dom in domains:
+        marker = "$sub" if dom.startswith(".") else "$end"
+        node = trie
+        for label in reversed(dom.lstrip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[marker] = 1
+    return trie
+
 def generate_pac(config: Dict[str, List]) -> str:
     direct_domains = config["direct_domains"]
     direct_subnets = [ipaddress.ip_network(net) for net in config["direct_subnets"]]
     protocol_proxies = config["protocol_proxies"]
     default_proxy = config["default_proxy"]
 
-    # JavaScript helpers for subnet checks
+    # Subnet checks: integer table for IP literals, isInNet for hostnames
+    subnets = json.dumps(
+        [[int(net.network_address), int(net.netmask)] for net in direct_subnets if net.version == 4],
+        separators=(",", ":"),
+    )
     subnet_checks = []
     for net in direct_subnets:
         subnet_checks.append(
             f'isInNet(host, "{net.network_address}", "{net.netmask}")'
         )
-    subnet_expr = " || ".join(subnet_checks)
-
-    # Domains check
-    domain_checks = []
-    for dom in direct_domains:
-        if dom.startswith("."):
-            domain_checks.append(f'dnsDomainIs(host, "{dom}")')
-        else:
-            domain_checks.append(f'host == "{dom}"')
-    domain_checks.append("isPlainHostName(host)")
-    domain_expr = " || ".join(domain_checks)
+    subnet_expr = " || ".join(subnet_checks) or "false"
+
+    # Domains check: one trie walk instead of a dnsDomainIs per domain
+    domain_trie = json.dumps(build_domain_trie(direct_domains), separators=(",", ":"), sort_keys=True)
 
     # Protocol-based proxy logic
     protocol_lines = []
@@ -55,11 +106,16 @@ def generate_pac(config: Dict[str, List]) -> str:
 
     # Build the PAC function
     pac = f"""\
+    var DIRECT_TRIE = {domain_trie};
+    var SUBNETS = {subnets};
+{IS_DIRECT_JS}{SUBNET_JS}
     function FindProxyForURL(url, host) {{
       // Bypass plain hostnames and specified domains
-      if ({domain_expr}) return "DIRECT";
+      if (isPlainHostName(host) || isDirect(host)) return "DIRECT";
       // Bypass specified subnets
-      if ({subnet_expr}) return "DIRECT";
+      if ({IP_LITERAL_RE}.test(host)) {{
+        if (inDirectSubnet(host)) return "DIRECT";
+      }} else if ({subnet_expr}) return "DIRECT";
     {protocol_logic}
       // Default proxy with failover
       return "{default_proxy}";
@@ -69,26 +125,104 @@ def generate_pac(config: Dict[str, List]) -> str:
 
 PAC_CONTENT = generate_pac(CONFIG)
 
-class PACHandler(http.server.BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path in ("/proxy.pac", "/wpad.dat"):
-            content = PAC_CONTENT.encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "application/x-ns-proxy-autoconfig")
-            self.send_header("Content-Length", str(len(content)))
-            self.end_headers()
-            self.wfile.write(content)
-        else:
-            self.send_error(404, "Not Found")
-
-    # def log_message(self, *args):
-    #     # Disable logging
-    #     pass
+# The PAC file never changes while the server runs, so encode, compress
+# and fingerprint it once instead of on every request.
+_PAC_BYTES = PAC_CONTENT.encode("utf-8")
+# mtime=0 keeps the gzip body identical across restarts
+_PAC_GZ = gzip.compress(_PAC_BYTES, 6, mtime=0)
+_PAC_ETAG = '"' + hashlib.blake2b(_PAC_BYTES, digest_size=16).hexdigest() + '"'
+# Each content coding is a distinct representation with its own tag
+_PAC_GZ_ETAG = _PAC_ETAG[:-1] + '-gz"'
+
+PAC_PATHS = ("/proxy.pac", "/wpad.dat")
+
+def _response(status: str, headers: List[str], body: bytes = b"") -> bytes:
+    head = [f"HTTP/1.1 {status}"] + headers + ["Connection: close", "", ""]
+    return "\r\n".join(head).encode("latin-1") + body
+
+_CACHE_HEADERS = [f"ETag: {_PAC_ETAG}", "Cache-Control: max-age=300", "Vary: Accept-Encoding"]
+_GZ_CACHE_HEADERS = [f"ETag: {_PAC_GZ_ETAG}", "Cache-Control: max-age=300", "Vary: Accept-Encoding"]
+_CONTENT_TYPE = "Content-Type: application/x-ns-proxy-autoconfig"
+
+# Every possible reply is fixed, so build them all up front.
+_RESP_PAC = _response(
+    "200 OK",
+    [_CONTENT_TYPE] + _CACHE_HEADERS + [f"Content-Length: {len(_PAC_BYTES)}"],
+    _PAC_BYTES,
+)
+_RESP_PAC_GZ = _response(
+    "200 OK",
+    [_CONTENT_TYPE] + _GZ_CACHE_HEADERS + [f"Content-Length: {len(_PAC_GZ)}", "Content-Encoding: gzip"],
+    _PAC_GZ,
+)
+_RESP_NOT_MODIFIED = _response("304 Not Modified", _CACHE_HEADERS)
+_RESP_NOT_MODIFIED_GZ = _response("304 Not Modified", _GZ_CACHE_HEADERS)
+_RESP_BAD_REQUEST = _response("400 Bad Request", ["Content-Length: 0"])
+_RESP_NOT_FOUND = _response("404 Not Found", ["Content-Length: 0"])
+_RESP_NOT_IMPLEMENTED = _response("501 Not Implemented", ["Content-Length: 0"])
+
+def _select_response(header_data: bytes) -> bytes:
+    lines = header_data.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        return _RESP_BAD_REQUEST
+    method, path, _ = parts
+    if method != "GET":
+        return _RESP_NOT_IMPLEMENTED
+    if path not in PAC_PATHS:
+        return _RESP_NOT_FOUND
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    # A cached copy in either coding is still current
+    if_none_match = headers.get("if-none-match", "")
+    if _PAC_GZ_ETAG in if_none_match:
+        return _RESP_NOT_MODIFIED_GZ
+    if _PAC_ETAG in if_none_match:
+        return _RESP_NOT_MODIFIED
+    if "gzip" in headers.get("accept-encoding", ""):
+        return _RESP_PAC_GZ
+    return _RESP_PAC
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        header_data = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        writer.close()
+        return
+    writer.write(_select_response(header_data))
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    writer.close()
+
+# A deep listen queue absorbs bursts of wpad.dat polls that arrive
+# faster than the loop accepts them, instead of the kernel refusing or
+# dropping the excess connections.
+ACCEPT_BACKLOG = 1024
+
+async def _serve(host: str = "0.0.0.0", port: int = 3128) -> None:
+    # SO_REUSEPORT lets several worker processes share the listen socket
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    server = await asyncio.start_server(
+        handle_client, host, port, reuse_port=reuse_port, backlog=ACCEPT_BACKLOG
+    )
+    print(f"Serving dynamic PAC file at http://{host}:{port}/proxy.pac")
+    async with server:
+        await server.serve_forever()
 
 def main():
-    with socketserver.ThreadingTCPServer(("0.0.0.0", 3128), PACHandler) as httpd:
-        print("Serving dynamic PAC file at http://0.0.0.0:3128/proxy.pac")
-        httpd.serve_forever()
+    # Run on uvloop when available without touching the global policy
+    loop_factory = uvloop.new_event_loop if uvloop else None
+    try:
+        asyncio.run(_serve(), loop_factory=loop_factory)
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
     main()
@@ -43,6 +43,14 @@ class BasePlugin(abc.ABC):
     #: Optional version string for the plugin.
     version: str = "0.0.0"
 
+    #: Set to ``False`` to keep the plugin out of request dispatch even
+    #: if it overrides ``handle_request``.
+    HANDLES_REQUEST: bool = True
+
+    #: Set to ``False`` to keep the plugin out of response dispatch even
+    #: if it overrides ``handle_response``.
+    HANDLES_RESPONSE: bool = True
+
     def __init__(self, manager: "PluginManager") -> None:
         self.manager = manager
         self.initialized = False
@@ -112,4 +120,17 @@ class BasePlugin(abc.ABC):
 # Type alias used in annotations to avoid circular imports.  The
 # HTTPRequest type is defined in server.py.
 class HTTPRequest:
-    pass
\ No newline at end of file
+    """Placeholder for :class:`proxy.server.HTTPRequest`.
+
+    Besides the raw request fields (``method``, ``path``, ``version``,
+    ``headers``, ``body``, ``client``) the request carries ``host_lc``:
+    the hostname from the ``Host`` header, lowercased and without the
+    port, or ``None`` if the header is missing, and ``port``: the port
+    from the ``Host`` header, or ``None`` if it has none.  Plugins
+    matching on the destination should use them instead of re-parsing
+    the header.
+
+    A plugin that changes any of those fields must set ``dirty`` to
+    ``True``.  Otherwise the proxy forwards the request bytes exactly as
+    they were received.
+    """
\ No newline at end of file
@@ -14,38 +14,116 @@ collects any CLI commands defined by the plugin.
 """
 from __future__ import annotations
 
-from typing import Callable, Dict, List, Optional
+import logging
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Type
 
 from .plugin_base import BasePlugin, HTTPRequest
 
+log = logging.getLogger(__name__)
+
 
 class PluginManager:
     """Coordinates loading and execution of proxy plugins."""
 
+    #: Built‑in plugin modules imported so far, keyed by registry name.
+    _builtin_modules: Dict[str, ModuleType] = {}
+
     def __init__(self) -> None:
         self.plugins: List[BasePlugin] = []
+        self.plugins_by_name: Dict[str, BasePlugin] = {}
         self.command_registry: Dict[str, Callable[[List[str]], Optional[str]]] = {}
+        # Bound hook methods in plugin order, rebuilt on registration so
+        # the request path iterates a flat list of callables.
+        self._request_chain: List[Callable[[HTTPRequest], bool]] = []
+        self._response_chain: List[Callable[[bytes, HTTPRequest], bytes]] = []
+        # Last dispatched command and its handler; interactive sessions
+        # tend to repeat the same command.
+        self._last_cmd: Optional[str] = None
+        self._last_func: Optional[Callable[[List[str]], Optional[str]]] = None
+        # Built‑in plugin classes resolved by this manager, mapped to the
+        # registry key that provided them.
+        self._builtin_sources: Dict[Type[BasePlugin], str] = {}
 
     def load_builtin_plugins(self) -> None:
         """Load the built‑in plugins shipped with the proxy.
 
-        Built‑ins live in ``proxy.plugins`` and must provide a class
-        called ``Plugin`` derived from ``BasePlugin``.
+        Built‑ins are listed in ``proxy.plugins.BUILTIN_PLUGINS`` and
+        must provide a class called ``Plugin`` derived from
+        ``BasePlugin``.  Imported modules are cached on the class so
+        later managers skip the import machinery.  Two entries resolving
+        to the same class raise ``ValueError``.
         """
-        import importlib
-        import pkgutil
-
-        package = "proxy.plugins"
-        package_obj = __import__(package, fromlist=['*'])
-        for _, module_name, _ in pkgutil.iter_modules(package_obj.__path__, package + "."):
-            module = importlib.import_module(module_name)
-            if hasattr(module, "Plugin"):
-                cls = getattr(module, "Plugin")
-                if not issubclass(cls, BasePlugin):
-                    continue
+        from .plugins import BUILTIN_PLUGINS
+
+        for key in BUILTIN_PLUGINS:
+            cls = self._builtin_class(key)
+            if cls is not None:
                 instance = cls(self)
                 self.register_plugin(instance)
 
+    def load_plugin(self, name: str) -> BasePlugin:
+        """Load one built‑in plugin by its plugin name and return it.
+
+        Plugins it depends on, as listed in
+        ``proxy.plugins.BUILTIN_MANIFEST``, are loaded first; other
+        built‑in modules are not imported.  A plugin that is already
+        registered is returned as is.  Unknown names raise ``KeyError``;
+        a manifest entry that does not match its module raises
+        ``ValueError``.
+        """
+        plugin = self.plugins_by_name.get(name)
+        if plugin is not None:
+            return plugin
+
+        from .plugins import BUILTIN_MANIFEST
+
+        key, requires = BUILTIN_MANIFEST[name]
+        for dependency in requires:
+            self.load_plugin(dependency)
+        cls = self._builtin_class(key)
+        if cls is None:
+            raise ValueError(f"Built-in {key} does not provide a Plugin class")
+        plugin = cls(self)
+        if plugin.name != name:
+            raise ValueError(f"Built-in {key} provides {plugin.name}, expected {name}")
+        self.register_plugin(plugin)
+        return plugin
+
+    def _builtin_class(self, key: str) -> Optional[Type[BasePlugin]]:
+        """Return the ``Plugin`` class of built‑in ``key``, or ``None``.
+
+        ``None`` means the module has no ``Plugin`` derived from
+        ``BasePlugin``.  Raises ``ValueError`` if another built‑in
+        already provided the same class.
+        """
+        module = self._import_builtin(key)
+        cls = getattr(module, "Plugin", None)
+        if not (isinstance(cls, type) and issubclass(cls, BasePlugin)):
+            return None
+        # The same class reached through two registry entries would
+        # otherwise only surface later as a duplicate name.
+        source = self._builtin_sources.setdefault(cls, key)
+        if source != key:
+            raise ValueError(
+                f"Plugin class {cls.__qualname__} from built-in {key} "
+                f"is already provided by built-in {source}"
+            )
+        return cls
+
+    @staticmethod
+    def _import_builtin(key: str) -> ModuleType:
+        """Import a built‑in plugin module by registry key, once per process."""
+        modules = PluginManager._builtin_modules
+        module = modules.get(key)
+        if module is None:
+            import importlib
+
+            from .plugins import BUILTIN_PLUGINS
+
+            module = modules[key] = importlib.import_module(BUILTIN_PLUGINS[key])
+        return module
+
     def load_external_plugins(self, path: str) -> None:
         """Load plugins from an external directory.
 
@@ -70,8 +148,8 @@ class PluginManager:
                         if issubclass(cls, BasePlugin):
                             instance = cls(self)
                             self.register_plugin(instance)
-                except Exception as exc:
-                    print(f"Failed to load plugin {file.name}: {exc}")
+                except Exception:
+                    log.exception("Failed to load plugin %s", file.name)
 
     def register_plugin(self, plugin: BasePlugin) -> None:
         """Register a plugin instance and initialise it.
@@ -80,16 +158,41 @@ class PluginManager:
         command registry.
         """
         # Avoid duplicate names
-        names = {p.name for p in self.plugins}
-        if plugin.name in names:
+        if plugin.name in self.plugins_by_name:
             raise ValueError(f"Duplicate plugin name: {plugin.name}")
         self.plugins.append(plugin)
+        self.plugins_by_name[plugin.name] = plugin
         plugin.initialize()
+        self._rebuild_chains()
         # Register CLI commands
         for command, func in plugin.get_commands().items():
             if command in self.command_registry:
                 raise ValueError(f"Duplicate command {command} registered by {plugin.name}")
             self.command_registry[command] = func
+        self._last_cmd = self._last_func = None
+
+    def _rebuild_chains(self) -> None:
+        # Plugins that opt out via HANDLES_REQUEST/HANDLES_RESPONSE or
+        # inherit the no-op hooks from BasePlugin are left out entirely;
+        # calling them could never change the outcome.
+        self._request_chain = [
+            p.handle_request
+            for p in self.plugins
+            if p.HANDLES_REQUEST and type(p).handle_request is not BasePlugin.handle_request
+        ]
+        self._response_chain = [
+            p.handle_response
+            for p in self.plugins
+            if p.HANDLES_RESPONSE and type(p).handle_response is not BasePlugin.handle_response
+        ]
+
+    def has_response_hooks(self) -> bool:
+        """Return ``True`` if any plugin overrides ``handle_response``.
+
+        The server streams responses straight to the client when no
+        plugin needs to see them.
+        """
+        return bool(self._response_chain)
 
     def finalize_plugins(self) -> None:
         """Invoke the finalization hook on all plugins in reverse order."""
@@ -103,14 +206,15 @@ class PluginManager:
         if any plugin denies it.  The chain stops at the first
         denial.
         """
-        for plugin in self.plugins:
-            try:
-                ok = plugin.handle_request(request)
-            except Exception as exc:
-                print(f"Plugin {plugin.name} raised exception: {exc}")
-                ok = False
-            if not ok:
-                return False
+        chain = self._request_chain
+        idx = 0
+        try:
+            for idx, hook in enumerate(chain):
+                if not hook(request):
+                    return False
+        except Exception:
+            log.exception("Plugin %s raised exception", chain[idx].__self__.name)
+            return False
         return True
 
     def process_response(self, response: bytes, request: HTTPRequest) -> bytes:
@@ -122,11 +226,11 @@ class PluginManager:
         most recent response.
         """
         data = response
-        for plugin in self.plugins:
+        for hook in self._response_chain:
             try:
-                data = plugin.handle_response(data, request)
-            except Exception as exc:
-                print(f"Plugin {plugin.name} raised exception during response: {exc}")
+                data = hook(data, request)
+            except Exception:
+                log.exception("Plugin %s raised exception during response", hook.__self__.name)
         return data
 
     def dispatch_command(self, line: str) -> Optional[str]:
@@ -135,12 +239,17 @@ class PluginManager:
         Commands are matched by their first token.  Unknown commands
         return a helpful error message.
         """
-        if not line.strip():
+        # Split off the command only; arguments are tokenised once the
+        # command is known to exist.
+        head = line.split(None, 1)
+        if not head:
             return None
-        tokens = line.strip().split()
-        cmd = tokens[0]
-        args = tokens[1:]
-        func = self.command_registry.get(cmd)
-        if func is None:
-            return f"Unknown command: {cmd}"
-        return func(args)
\ No newline at end of file
+        cmd = head[0]
+        if cmd == self._last_cmd:
+            func = self._last_func
+        else:
+            func = self.command_registry.get(cmd)
+            if func is None:
+                return f"Unknown command: {cmd}"
+            self._last_cmd, self._last_func = cmd, func
+        return func(head[1].split() if len(head) > 1 else [])
\ No newline at end of file
@@ -6,9 +6,28 @@ This package contains three modules:
 * `firewall_config` – YAML persistence for firewall rules.
 * `firewall_shell` – Interactive CLI for managing the firewall.
 
-Plugins are automatically discovered by the `PluginManager` and
-registered at startup.  Each module must expose a class named
-`Plugin` deriving from `BasePlugin`.
+The modules are listed in `BUILTIN_PLUGINS`, which the `PluginManager`
+imports in order at startup instead of scanning this package on disk.
+Each module must expose a class named `Plugin` deriving from
+`BasePlugin`.  New built‑ins must be added to the registry.
+
+`BUILTIN_MANIFEST` lets `PluginManager.load_plugin` load a single
+built‑in by plugin name, together with the plugins it depends on,
+without importing the others.
 """
 
+#: Built‑in plugin modules in load order, keyed by module name.
+BUILTIN_PLUGINS = {
+    "firewall": "proxy.plugins.firewall",
+    "firewall_config": "proxy.plugins.firewall_config",
+    "firewall_shell": "proxy.plugins.firewall_shell",
+}
+
+#: Built‑in plugins by plugin name: (registry key, plugins loaded first).
+BUILTIN_MANIFEST = {
+    "Firewall": ("firewall", ()),
+    "FirewallConfig": ("firewall_config", ("Firewall",)),
+    "FirewallShell": ("firewall_shell", ("Firewall", "FirewallConfig")),
+}
+
 __all__ = ["firewall", "firewall_config", "firewall_shell"]
\ No newline at end of file
@@ -16,12 +16,232 @@ The firewall does not persist rules on its own.  Use the
 
 from __future__ import annotations
 
+import functools
 import ipaddress
-from typing import Any, Dict, List, Optional
-from urllib.parse import urlsplit
+import socket
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..plugin_base import BasePlugin, HTTPRequest
 
+# Addresses and networks are reduced to plain integers so that the
+# per-request containment test is ``(addr & mask) == net``.
+#   _Address: (version, address_int)
+#   _Network: (version, network_int, mask_int)
+_Address = Tuple[int, int]
+_Network = Tuple[int, int, int]
+
+
+# Rule sets are reloaded wholesale (e.g. from YAML) and IPv6 clients
+# reconnect from the same addresses, so the same strings are parsed over
+# and over.  Memoise the ipaddress constructors.
+@functools.lru_cache(maxsize=1024)
+def _ip_network(text: Any) -> ipaddress.IPv4Network | ipaddress.IPv6Network:
+    return ipaddress.ip_network(text, strict=False)
+
+
+@functools.lru_cache(maxsize=4096)
+def _ip_address(text: Any) -> ipaddress.IPv4Address | ipaddress.IPv6Address:
+    return ipaddress.ip_address(text)
+
+
+def _parse_address(text: Any) -> Optional[_Address]:
+    """Parse an IP address into ``(version, int)`` or return ``None``."""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except (OSError, TypeError):
+        pass
+    try:
+        addr = _ip_address(text)
+    except (TypeError, ValueError):
+        return None
+    return addr.version, int(addr)
+
+
+def _parse_network(text: Any) -> Optional[_Network]:
+    """Parse an IP address or CIDR range into ``(version, net, mask)``."""
+    try:
+        net = _ip_network(text)
+    except (TypeError, ValueError):
+        return None
+    return net.version, int(net.network_address), int(net.netmask)
+
+
+def _in_network(addr: _Address, net: _Network) -> bool:
+    return addr[0] == net[0] and addr[1] & net[2] == net[1]
+
+
+class _CompiledRule:
+    """A firewall rule normalised for matching.
+
+    Aliased keys are resolved to canonical fields, strings are case
+    folded and networks/ports are parsed once, so matching a request is
+    plain attribute access and comparison.  Empty conditions are stored
+    as ``None``.
+    """
+
+    __slots__ = (
+        "action",
+        "src_net",
+        "dst_net",
+        "domain_lc",
+        "domain_dot",
+        "method_uc",
+        "path",
+        "src_port",
+        "dst_port",
+        "protocol_lc",
+    )
+
+    def __init__(
+        self,
+        action: str,
+        src_net: Optional[_Network],
+        dst_net: Optional[_Network],
+        domain_lc: Optional[str],
+        method_uc: Optional[str],
+        path: Optional[str],
+        src_port: Optional[int],
+        dst_port: Optional[int],
+        protocol_lc: Optional[str],
+    ) -> None:
+        self.action = action
+        self.src_net = src_net
+        self.dst_net = dst_net
+        self.domain_lc = domain_lc
+        self.domain_dot = "." + domain_lc if domain_lc else None
+        self.method_uc = method_uc
+        self.path = path
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.protocol_lc = protocol_lc
+
+
+def _compile_rule(rule: Dict[str, Any]) -> Optional[_CompiledRule]:
+    """Compile a raw rule dict into a :class:`_CompiledRule`.
+
+    Supported rule keys (aliases in parentheses):
+      - action: "allow" or "deny"
+      - src_ip (src, source, ip): source IP or CIDR range
+      - dst_ip (dst, dest, destination): destination IP or CIDR range
+      - src_port (sport, source_port): source port number
+      - dst_port (port, dest_port): destination port number
+      - domain (host): destination host or suffix (e.g. "example.com")
+      - protocol: "http", "tcp", "websocket", etc.
+      - method: HTTP method (e.g. "GET")
+      - path: URL path prefix
+    Unknown keys are ignored.  Returns ``None`` for rules that can never
+    match because a network or port value cannot be parsed.
+    """
+    src_ip = rule.get("src_ip") or rule.get("src") or rule.get("source") or rule.get("ip")
+    src_net = None
+    if src_ip:
+        src_net = _parse_network(src_ip)
+        if src_net is None:
+            return None
+
+    dst_ip = rule.get("dst_ip") or rule.get("dst") or rule.get("dest") or rule.get("destination")
+    dst_net = None
+    if dst_ip:
+        dst_net = _parse_network(dst_ip)
+        if dst_net is None:
+            return None
+
+    src_port = rule.get("src_port") or rule.get("sport") or rule.get("source_port")
+    dst_port = rule.get("dst_port") or rule.get("port") or rule.get("dest_port")
+    try:
+        src_port = int(src_port) if src_port else None
+        dst_port = int(dst_port) if dst_port else None
+    except (TypeError, ValueError):
+        return None
+
+    domain = rule.get("domain") or rule.get("host")
+    method = rule.get("method")
+    protocol = rule.get("protocol")
+    return _CompiledRule(
+        action=rule.get("action", "allow").lower(),
+        src_net=src_net,
+        dst_net=dst_net,
+        domain_lc=domain.lower() if domain else None,
+        method_uc=method.upper() if method else None,
+        path=rule.get("path") or None,
+        src_port=src_port,
+        dst_port=dst_port,
+        protocol_lc=protocol.lower() if protocol else None,
+    )
+
+
+def _destination(request: HTTPRequest) -> Tuple[Optional[str], int]:
+    """Return the destination host and port from the Host header."""
+    return request.host_lc or None, request.port or 80
+
+
+class _RequestView:
+    """The request attributes the firewall matches on, resolved once."""
+
+    __slots__ = (
+        "client_ip",
+        "client_port",
+        "host",
+        "host_ip",
+        "port",
+        "method",
+        "protocol",
+        "path",
+    )
+
+    def __init__(self, request: HTTPRequest, client_ip: _Address, want_host_ip: bool) -> None:
+        self.client_ip = client_ip
+        self.client_port = request.client[1]
+        self.host, self.port = _destination(request)
+        # Parsing a hostname as an address fails and is not memoised, so
+        # only attempt it when some rule matches on dst_ip.
+        self.host_ip = _parse_address(self.host) if want_host_ip and self.host else None
+        self.method = request.method.upper()
+        # CONNECT implies raw TCP; otherwise HTTP
+        self.protocol = "tcp" if self.method == "CONNECT" else "http"
+        self.path = request.path
+
+
+class _TrieNode:
+    __slots__ = ("children", "rule_ids")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.rule_ids: List[int] = []
+
+
+class _DomainTrie:
+    """Reverse-label trie of rule domains.
+
+    Domains are split on ``.`` and inserted TLD first, so looking up a
+    host walks its labels once and collects every rule whose domain is
+    the host itself or one of its parent domains.
+    """
+
+    __slots__ = ("root",)
+
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+
+    def insert(self, domain: str, rule_id: int) -> None:
+        node = self.root
+        for label in reversed(domain.split(".")):
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = _TrieNode()
+            node = child
+        node.rule_ids.append(rule_id)
+
+    def match(self, host: str) -> List[int]:
+        matches: List[int] = []
+        node = self.root
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                break
+            matches += node.rule_ids
+        return matches
+
 
 class Firewall(BasePlugin):
     name = "Firewall"
@@ -34,6 +254,18 @@ class Firewall(BasePlugin):
         # key ("allow" or "deny") and optional match criteria: 'ip',
         # 'method', 'host', 'path'.
         self.rules: List[Dict[str, Any]] = []
+        # Rule indices bucketed by exact-match discriminator so that
+        # handle_request only evaluates rules that can possibly match.
+        self._compiled: Tuple[Optional[_CompiledRule], ...] = ()
+        self._domains = _DomainTrie()
+        self._by_method: Dict[str, List[int]] = {}
+        self._by_dst_port: Dict[int, List[int]] = {}
+        self._by_protocol: Dict[str, List[int]] = {}
+        self._wildcard: List[int] = []
+        # Whether any compiled rule matches on the destination address
+        self._uses_dst_ip = False
+        # Set when the rule list changed since the last compile()
+        self._dirty = False
 
     def initialize(self) -> None:
         super().initialize()
@@ -45,146 +277,143 @@ class Firewall(BasePlugin):
 
     def set_rules(self, rules: List[Dict[str, Any]]) -> None:
         self.rules = list(rules)
+        self.invalidate()
 
     def add_rule(self, rule: Dict[str, Any], index: Optional[int] = None) -> None:
         if index is None:
             self.rules.append(rule)
         else:
             self.rules.insert(index, rule)
+        self.invalidate()
 
     def remove_rule(self, index: int) -> None:
         if 0 <= index < len(self.rules):
             self.rules.pop(index)
+            self.invalidate()
 
     def clear_rules(self) -> None:
         self.rules.clear()
+        self.invalidate()
 
-    # Match helper
-    def _match_rule(self, rule: Dict[str, Any], request: HTTPRequest) -> bool:
-        """
-        Return True if the request matches all of the conditions in the rule.
-
-        Supported rule keys (aliases in parentheses):
-          - action: "allow" or "deny" (checked in handle_request)
-          - src_ip (src, source, ip): source IP or CIDR range
-          - dst_ip (dst, dest, destination): destination IP or CIDR range
-          - src_port (sport, source_port): source port number
-          - dst_port (port, dest_port): destination port number
-          - domain (host): destination host or suffix (e.g. "example.com")
-          - protocol: "http", "tcp", "websocket", etc.
-          - method: HTTP method (e.g. "GET")
-          - path: URL path prefix
-        Unknown keys are ignored.
-        """
-        # Resolve client IP and port
-        try:
-            client_ip = ipaddress.ip_address(request.client[0])
-            client_port = request.client[1]
-        except Exception:
-            return False
+    def invalidate(self) -> None:
+        """Mark the compiled rules stale after ``rules`` changed.
 
-        # Resolve destination host and port from Host header
-        host_header = request.header("host")
-        dest_host: Optional[str] = None
-        dest_port: int = 80
+        The next request recompiles them, so a batch of edits costs a
+        single compile.  Call this after mutating ``rules`` directly.
+        """
+        self._dirty = True
 
-        if host_header:
-            parsed = urlsplit(f"//{host_header}")
-            dest_host = parsed.hostname
-            dest_port = parsed.port or 80
+    def compile(self) -> None:
+        """Compile the rules and bucket them by their most selective key.
 
-        # Determine protocol: CONNECT implies raw TCP; otherwise HTTP
-        req_protocol = "tcp" if request.method.upper() == "CONNECT" else "http"
+        Each rule is compiled into the immutable ``_compiled`` tuple
+        (``None`` if it can never match) and lands in exactly one bucket:
+        the domain trie if it names a domain, otherwise by HTTP method,
+        then destination port, then protocol, and otherwise the wildcard
+        list.  The buckets only pre-filter; ``_match_rule`` still checks
+        every condition.
+        """
+        compiled = tuple(_compile_rule(rule) for rule in self.rules)
+        domains = _DomainTrie()
+        by_method: Dict[str, List[int]] = {}
+        by_dst_port: Dict[int, List[int]] = {}
+        by_protocol: Dict[str, List[int]] = {}
+        wildcard: List[int] = []
+
+        for idx, rule in enumerate(compiled):
+            if rule is None:
+                continue
+            if rule.domain_lc:
+                domains.insert(rule.domain_lc, idx)
+            elif rule.method_uc:
+                by_method.setdefault(rule.method_uc, []).append(idx)
+            elif rule.dst_port is not None:
+                by_dst_port.setdefault(rule.dst_port, []).append(idx)
+            elif rule.protocol_lc:
+                by_protocol.setdefault(rule.protocol_lc, []).append(idx)
+            else:
+                wildcard.append(idx)
+
+        self._compiled = compiled
+        self._domains = domains
+        self._by_method = by_method
+        self._by_dst_port = by_dst_port
+        self._by_protocol = by_protocol
+        self._wildcard = wildcard
+        self._uses_dst_ip = any(rule is not None and rule.dst_net for rule in compiled)
+        self._dirty = False
 
+    # Match helper
+    @staticmethod
+    def _match_rule(rule: _CompiledRule, req: _RequestView) -> bool:
+        """Return True if the request matches all of the rule's conditions."""
         # --- Source IP ---
-        src_ip = (
-            rule.get("src_ip")
-            or rule.get("src")
-            or rule.get("source")
-            or rule.get("ip")
-        )
-
-        if src_ip:
-            try:
-                network = ipaddress.ip_network(src_ip, strict=False)
-                if client_ip not in network:
-                    return False
-            except ValueError:
-                return False
+        if rule.src_net and not _in_network(req.client_ip, rule.src_net):
+            return False
 
         # --- Destination IP ---
-        dst_ip = (
-            rule.get("dst_ip")
-            or rule.get("dst")
-            or rule.get("dest")
-            or rule.get("destination")
-        )
-
-        if dst_ip:
-            if not dest_host:
-                return False
-            try:
-                dest_ip_obj = ipaddress.ip_address(dest_host)
-                dest_network = ipaddress.ip_network(dst_ip, strict=False)
-                if dest_ip_obj not in dest_network:
-                    return False
-            except ValueError:
-                return False
+        if rule.dst_net and (req.host_ip is None or not _in_network(req.host_ip, rule.dst_net)):
+            return False
 
         # --- Domain/host match ---
-        domain = rule.get("domain") or rule.get("host")
-        if domain:
-            if not dest_host:
-                return False
-
-            d = domain.lower()
-            h = dest_host.lower()
-
-            # allow suffix match (e.g. "example.com" matches "sub.example.com")
-            if h != d and not h.endswith("." + d):
+        # allow suffix match (e.g. "example.com" matches "sub.example.com")
+        if rule.domain_lc:
+            h = req.host
+            if not h or (h != rule.domain_lc and not h.endswith(rule.domain_dot)):
                 return False
 
         # --- Source port ---
-        src_port = rule.get("src_port") or rule.get("sport") or rule.get("source_port")
-        if src_port:
-            try:
-                if client_port != int(src_port):
-                    return False
-            except ValueError:
-                return False
+        if rule.src_port is not None and req.client_port != rule.src_port:
+            return False
 
         # --- Destination port ---
-        dst_port = rule.get("dst_port") or rule.get("port") or rule.get("dest_port")
-        if dst_port:
-            try:
-                if dest_port != int(dst_port):
-                    return False
-            except ValueError:
-                return False
+        if rule.dst_port is not None and req.port != rule.dst_port:
+            return False
 
         # --- Protocol ---
-        protocol = rule.get("protocol")
-        if protocol and req_protocol != protocol.lower():
+        if rule.protocol_lc and req.protocol != rule.protocol_lc:
             return False
 
         # --- HTTP method ---
-        method = rule.get("method")
-        if method and request.method.upper() != method.upper():
+        if rule.method_uc and req.method != rule.method_uc:
             return False
 
         # --- URL path ---
-        path = rule.get("path")
-        if path and not request.path.startswith(path):
+        if rule.path and not req.path.startswith(rule.path):
             return False
 
         return True
 
     def handle_request(self, request: HTTPRequest) -> bool:
-        # Iterate through rules in order
-        for rule in self.rules:
-            if self._match_rule(rule, request):
-                action = rule.get("action", "allow").lower()
-                return action == "allow"
+        if not self.rules:
+            return True
+        if self._dirty:
+            self.compile()
+
+        # Parse the client address once; if it is not a valid IP address
+        # no rule can match and the request falls through to the default.
+        try:
+            client_ip = _parse_address(request.client[0])
+        except (TypeError, IndexError):
+            client_ip = None
+        if client_ip is None:
+            return True
+        req = _RequestView(request, client_ip, self._uses_dst_ip)
+
+        # Gather the rules that can possibly match this request and
+        # evaluate them in their original order (first match wins).
+        candidates = self._domains.match(req.host) if req.host else []
+        candidates += self._wildcard
+        candidates += self._by_method.get(req.method, ())
+        candidates += self._by_dst_port.get(req.port, ())
+        candidates += self._by_protocol.get(req.protocol, ())
+        candidates.sort()
+
+        compiled = self._compiled
+        for idx in candidates:
+            rule = compiled[idx]
+            if self._match_rule(rule, req):
+                return rule.action == "allow"
         # Default permit
         return True
 
@@ -197,13 +426,10 @@ class Firewall(BasePlugin):
         }
 
     def _cmd_show_rules(self, args: List[str]) -> str:
-        lines = []
-        if not self.rules:
-            return "No firewall rules configured."
-        for idx, rule in enumerate(self.rules):
-            parts = [f"{k}={v}" for k, v in rule.items()]
-            lines.append(f"{idx}: " + ", ".join(parts))
-        return "\n".join(lines)
+        return "\n".join(
+            f"{idx}: " + ", ".join(f"{k}={v}" for k, v in rule.items())
+            for idx, rule in enumerate(self.rules, 0)
+        ) or "No firewall rules configured."
 
 
 # The Plugin class is what the plugin manager instantiates.
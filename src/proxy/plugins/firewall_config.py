@@ -9,11 +9,17 @@ key in the YAML document.  You can point the plugin at a custom
 filename (default is `config.yaml` in the proxy package) when
 instantiating the proxy server.
 
+The file format follows the extension: ``.json`` files are read and
+written with `orjson` (falling back to the standard library `json`),
+``.msgpack`` files with `msgpack`, and anything else as YAML.  JSON
+and MessagePack are much faster to parse than YAML for large,
+machine‑managed rule sets.
+
 CLI commands provided by this plugin:
 
-* ``load-config [filename]`` — load firewall rules from a YAML file.
+* ``load-config [filename]`` — load firewall rules from a config file.
   If no filename is provided, the plugin uses its configured default.
-* ``save-config [filename]`` — write current rules to a YAML file.
+* ``save-config [filename]`` — write current rules to a config file.
 * ``reset-config`` — clear all rules in the firewall.
 
 This plugin relies on the presence of the `Firewall` plugin.  It will
@@ -21,18 +27,69 @@ raise an exception if no firewall is loaded.
 """
 from __future__ import annotations
 
+import json
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 
-from ..plugin_base import BasePlugin, HTTPRequest
+try:
+    # Prefer the LibYAML C bindings when PyYAML was built with them
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+try:
+    import orjson  # optional
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # optional
+except ImportError:
+    msgpack = None
+
+from ..plugin_base import BasePlugin
+
+
+def _config_format(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".json":
+        return "json"
+    if ext == ".msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack is required for .msgpack config files")
+        return "msgpack"
+    return "yaml"
+
+
+def _decode_config(filename: str, raw: bytes) -> Any:
+    fmt = _config_format(filename)
+    if fmt == "json":
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    if fmt == "msgpack":
+        return msgpack.unpackb(raw)
+    return yaml.load(raw.decode("utf-8"), Loader=_Loader)
+
+
+def _encode_config(filename: str, data: Dict[str, Any]) -> bytes:
+    fmt = _config_format(filename)
+    if fmt == "json":
+        if orjson:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        return json.dumps(data, indent=2).encode("utf-8")
+    if fmt == "msgpack":
+        return msgpack.packb(data)
+    text = yaml.dump(data, Dumper=_Dumper, sort_keys=False, default_flow_style=False)
+    return text.encode("utf-8")
 
 
 class FirewallConfig(BasePlugin):
     name = "FirewallConfig"
     version = "1.0.0"
     description = "Persist firewall rules to YAML and restore them on startup"
+    HANDLES_REQUEST = False
+    HANDLES_RESPONSE = False
 
     def __init__(self, manager, filename: Optional[str] = None) -> None:
         super().__init__(manager)
@@ -43,10 +100,7 @@ class FirewallConfig(BasePlugin):
     def initialize(self) -> None:
         super().initialize()
         # Locate the firewall plugin
-        for plugin in self.manager.plugins:
-            if plugin.name == "Firewall":
-                self.firewall = plugin
-                break
+        self.firewall = self.manager.plugins_by_name.get("Firewall")
         if self.firewall is None:
             raise RuntimeError("FirewallConfig requires the Firewall plugin to be loaded")
         # Attempt to load initial configuration
@@ -88,8 +142,8 @@ class FirewallConfig(BasePlugin):
 
     # Persistence methods
     def load_config(self, filename: str) -> None:
-        with open(filename, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        with open(filename, "rb") as f:
+            data = _decode_config(filename, f.read()) or {}
         rules = data.get("rules", [])
         if self.firewall:
             self.firewall.set_rules(rules)
@@ -99,16 +153,9 @@ class FirewallConfig(BasePlugin):
             rules = self.firewall.get_rules()
         else:
             rules = []
-        with open(filename, "w", encoding="utf-8") as f:
-            yaml.safe_dump({"rules": rules}, f, sort_keys=False)
-
-    # The config plugin does not participate in request/response handling
-    # and therefore leaves these hooks as no‑ops.
-    def handle_request(self, request: HTTPRequest) -> bool:
-        return True
-
-    def handle_response(self, response: bytes, request: HTTPRequest) -> bytes:
-        return response
+        payload = _encode_config(filename, {"rules": rules})
+        with open(filename, "wb") as f:
+            f.write(payload)
 
 
 class Plugin(FirewallConfig):
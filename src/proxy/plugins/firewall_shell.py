@@ -24,31 +24,104 @@ looks up these plugins via the manager passed to its constructor.
 
 from __future__ import annotations
 
+import re
 import shlex
-from typing import Callable, Dict, List
+import sys
+from typing import Callable, Dict, List, Optional
+
+from ..plugin_base import BasePlugin
+
+# Runs of characters other than shlex's whitespace.  Lines without
+# quotes or escapes tokenise identically with one C-level regex scan.
+_TOKEN_RE = re.compile(r"[^ \t\r\n]+")
+_SHLEX_CHARS = frozenset("\"'\\")
+
+
+# Rule parameter names accepted by ``rule add``, mapped to canonical keys
+_ALIAS_MAP: Dict[str, str] = {
+    "src": "src_ip",
+    "source": "src_ip",
+    "ip": "src_ip",
+    "src_ip": "src_ip",
+    "dst": "dst_ip",
+    "dest": "dst_ip",
+    "destination": "dst_ip",
+    "dst_ip": "dst_ip",
+    "sport": "src_port",
+    "source_port": "src_port",
+    "src_port": "src_port",
+    "port": "dst_port",
+    "dest_port": "dst_port",
+    "dst_port": "dst_port",
+    "proto": "protocol",
+    "protocol": "protocol",
+    "host": "domain",
+    "domain": "domain",
+    "method": "method",
+    "path": "path",
+    "desc": "description",
+    "description": "description",
+}
+
+_HELP_TEXT = """\
+Available commands:
+  show rules                 - Display current firewall rules
+  configure terminal         - Enter configuration mode
+  write memory               - Save rules to config file
+  help                       - Show this help message
+
+Configuration mode commands:
+  rule add <allow|deny> [key=value ...]  - Add a rule
+    Supported keys:
+      src_ip, dst_ip, src_port, dst_port, domain, protocol, method, path, description
+      (aliases: src, source, ip, dst, dest, destination, sport, source_port, port, dest_port, host)
+  rule del <index>                        - Delete rule by index
+  rule show <index>                       - Show a single rule
+"""
+
 
-from ..plugin_base import BasePlugin, HTTPRequest
+def _split_line(line: str) -> List[str]:
+    """Split a shell line like ``shlex.split`` but faster in the common case."""
+    if _SHLEX_CHARS.isdisjoint(line):
+        return _TOKEN_RE.findall(line)
+    return shlex.split(line)
 
 
 class FirewallShell(BasePlugin):
     name = "FirewallShell"
     version = "1.0.0"
     description = "Cisco‑style CLI for configuring the firewall"
+    HANDLES_REQUEST = False
+    HANDLES_RESPONSE = False
 
     def __init__(self, manager) -> None:
         super().__init__(manager)
         self.firewall = None
         self.config = None
         self._running = False
+        # Command tables per mode.  Handlers take the argument list and
+        # return the mode to switch to, or None to stay in the current one.
+        self._exec_dispatch: Dict[str, Callable[[List[str]], Optional[str]]] = {
+            "help": self._print_help,
+            "?": self._print_help,
+            "show": self._handle_show,
+            "configure": self._handle_configure,
+            "conf": self._handle_configure,
+            "write": self._handle_write_cmd,
+            "wr": self._handle_write_cmd,
+        }
+        self._config_dispatch: Dict[str, Callable[[List[str]], Optional[str]]] = {
+            "exit": self._handle_exit,
+            "rule": self._handle_rule,
+            "show": self._handle_show,
+        }
 
     def initialize(self) -> None:
         super().initialize()
         # Locate dependencies
-        for plugin in self.manager.plugins:
-            if plugin.name == "Firewall":
-                self.firewall = plugin
-            if plugin.name == "FirewallConfig":
-                self.config = plugin
+        plugins = self.manager.plugins_by_name
+        self.firewall = plugins.get("Firewall")
+        self.config = plugins.get("FirewallConfig")
         if self.firewall is None:
             raise RuntimeError("FirewallShell requires the Firewall plugin")
 
@@ -81,68 +154,54 @@ class FirewallShell(BasePlugin):
             if not line.strip():
                 continue
 
-            tokens = shlex.split(line)
+            tokens = _split_line(line)
             cmd = tokens[0].lower()
             args = tokens[1:]
 
-            if mode == "exec":
-                if cmd in ("help", "?"):
-                    self._print_help()
-                elif cmd in ("show",):
-                    self._handle_show(args)
-                elif cmd in ("configure", "conf"):
-                    if args and args[0] in ("terminal", "t"):
-                        mode = "config"
-                        print("Entering configuration mode.  Type 'exit' to leave.")
-                    else:
-                        print("Usage: configure terminal")
-                elif cmd in ("write", "wr"):
-                    if args and args[0] in ("memory", "mem"):
-                        self._handle_write()
-                    else:
-                        print("Usage: write memory")
-                else:
-                    print(f"Unknown command: {cmd}")
-            elif mode == "config":
-                if cmd == "exit":
-                    mode = "exec"
-                    print("Leaving configuration mode.")
-                elif cmd == "rule":
-                    self._handle_rule(args)
-                elif cmd in ("show",):
-                    self._handle_show(args)
-                else:
+            if mode == "config":
+                handler = self._config_dispatch.get(cmd)
+                if handler is None:
                     print(f"Unknown config command: {cmd}")
+                    continue
+            else:
+                handler = self._exec_dispatch.get(cmd)
+                if handler is None:
+                    print(f"Unknown command: {cmd}")
+                    continue
+
+            new_mode = handler(args)
+            if new_mode:
+                mode = new_mode
 
     # Exec‑mode handlers
-    def _print_help(self) -> None:
-        print("Available commands:")
-        print("  show rules                 - Display current firewall rules")
-        print("  configure terminal         - Enter configuration mode")
-        print("  write memory               - Save rules to config file")
-        print("  help                       - Show this help message")
-        print("\nConfiguration mode commands:")
-        print("  rule add <allow|deny> [key=value ...]  - Add a rule")
-        print("    Supported keys:")
-        print(
-            "      src_ip, dst_ip, src_port, dst_port, domain, protocol, method, path, description"
-        )
-        print(
-            "      (aliases: src, source, ip, dst, dest, destination, sport, source_port, port, dest_port, host)"
-        )
-        print("  rule del <index>                        - Delete rule by index")
-        print("  rule show <index>                       - Show a single rule")
+    def _print_help(self, args: Optional[List[str]] = None) -> None:
+        sys.stdout.write(_HELP_TEXT)
+
+    def _handle_configure(self, args: List[str]) -> Optional[str]:
+        if args and args[0] in ("terminal", "t"):
+            print("Entering configuration mode.  Type 'exit' to leave.")
+            return "config"
+        print("Usage: configure terminal")
+        return None
+
+    def _handle_write_cmd(self, args: List[str]) -> None:
+        if args and args[0] in ("memory", "mem"):
+            self._handle_write()
+        else:
+            print("Usage: write memory")
 
     def _handle_show(self, args: List[str]) -> None:
         if args[:1] == ["rules"]:
             if self.firewall:
-                rules = self.firewall.get_rules()
-                if not rules:
-                    print("No firewall rules configured.")
-                else:
-                    for idx, rule in enumerate(rules):
-                        parts = [f"{k}={v}" for k, v in rule.items()]
-                        print(f"{idx}: " + ", ".join(parts))
+                # Build the whole listing and write it once; a print per
+                # rule is dominated by stdout locking and flushing.
+                lines = [
+                    f"{idx}: " + ", ".join(f"{k}={v}" for k, v in rule.items())
+                    for idx, rule in enumerate(self.firewall.get_rules())
+                ]
+                lines.append("" if lines else "No firewall rules configured.\n")
+                sys.stdout.write("\n".join(lines))
+                sys.stdout.flush()
             else:
                 print("Firewall plugin not loaded")
         else:
@@ -156,6 +215,10 @@ class FirewallShell(BasePlugin):
             print("FirewallConfig plugin not loaded; cannot save")
 
     # Config‑mode handlers
+    def _handle_exit(self, args: List[str]) -> str:
+        print("Leaving configuration mode.")
+        return "exec"
+
     def _handle_rule(self, args: List[str]) -> None:
         if not args:
             print(
@@ -180,42 +243,19 @@ class FirewallShell(BasePlugin):
                 return
 
             params: Dict[str, str] = {"action": action}
-            # Aliases for parameter names
-            alias_map = {
-                "src": "src_ip",
-                "source": "src_ip",
-                "ip": "src_ip",
-                "src_ip": "src_ip",
-                "dst": "dst_ip",
-                "dest": "dst_ip",
-                "destination": "dst_ip",
-                "dst_ip": "dst_ip",
-                "sport": "src_port",
-                "source_port": "src_port",
-                "src_port": "src_port",
-                "port": "dst_port",
-                "dest_port": "dst_port",
-                "dst_port": "dst_port",
-                "proto": "protocol",
-                "protocol": "protocol",
-                "host": "domain",
-                "domain": "domain",
-                "method": "method",
-                "path": "path",
-                "desc": "description",
-                "description": "description",
-            }
+            # Warnings are collected and written together with the result
+            out: List[str] = []
 
             for token in args[2:]:
                 if "=" not in token:
-                    print(f"Ignoring invalid token: {token}")
+                    out.append(f"Ignoring invalid token: {token}")
                     continue
 
                 key, value = token.split("=", 1)
-                norm_key = alias_map.get(key.lower())
+                norm_key = _ALIAS_MAP.get(key.lower())
 
                 if not norm_key:
-                    print(f"Unknown key: {key}")
+                    out.append(f"Unknown key: {key}")
                     continue
 
                 # Remove surrounding quotes if present
@@ -225,9 +265,12 @@ class FirewallShell(BasePlugin):
 
             if self.firewall:
                 self.firewall.add_rule(params)
-                print(f"Rule added: {params}")
+                out.append(f"Rule added: {params}")
             else:
-                print("Firewall plugin not loaded")
+                out.append("Firewall plugin not loaded")
+            out.append("")
+            sys.stdout.write("\n".join(out))
+            sys.stdout.flush()
         elif subcmd in ("del", "remove"):
             if len(args) < 2 or not args[1].isdigit():
                 print("Usage: rule del <index>")
@@ -264,13 +307,6 @@ class FirewallShell(BasePlugin):
         else:
             print(f"Unknown rule subcommand: {subcmd}")
 
-    # The shell plugin does not handle HTTP events
-    def handle_request(self, request: HTTPRequest) -> bool:
-        return True
-
-    def handle_response(self, response: bytes, request: HTTPRequest) -> bytes:
-        return response
-
 
 class Plugin(FirewallShell):
     pass
@@ -10,11 +10,13 @@ may allow or deny it or even modify the request.  Responses from
 upstream servers similarly flow through the plugin chain.
 
 This implementation is intentionally simplified for clarity and is
-**not** suitable for production use.  It does not support HTTPS
-tunnelling via the CONNECT method, persistent connections or chunked
-transfer encoding.  The intent is to demonstrate a clean
-architecture rather than to cover every edge case in the HTTP
-specification.
+**not** suitable for production use.  HTTPS and other TCP traffic is
+tunnelled via the CONNECT method and WebSocket upgrades are relayed
+as raw bytes, but persistent client connections and chunked request
+bodies are not supported.  Upstream connections are kept alive and
+reused for later requests to the same host.  The intent is to
+demonstrate a clean architecture rather than to cover every edge case
+in the HTTP specification.
 
 Usage:
 
@@ -31,7 +33,12 @@ from __future__ import annotations
 
 import asyncio
 import argparse
-import re
+import logging
+import logging.handlers
+import queue
+import socket
+import struct
+import time
 from typing import Dict, Optional, Tuple
 from urllib.parse import urlsplit
 
@@ -40,13 +47,59 @@ try:
 except ImportError:
     uvloop = None
 
+try:
+    import httptools  # optional
+except ImportError:
+    httptools = None
+
 from .plugin_manager import PluginManager
 
+# Read size for relayed bodies and tunnels (matches the Linux pipe buffer)
+CHUNK_SIZE = 64 * 1024
+# Tunnels only wait for the peer once this much output is queued
+TUNNEL_HIGH_WATER = 256 * 1024
+# Largest request head accepted from a client, in bytes
+HEADER_LIMIT = 16 * 1024
+# Seconds a client gets to send its complete request head
+HEADER_TIMEOUT = 5.0
+# Idle upstream connections are closed after this many seconds
+UPSTREAM_IDLE_TIMEOUT = 30.0
+# At most this many idle connections are kept per upstream host
+UPSTREAM_MAX_IDLE = 8
+# Resolved upstream addresses are reused for this many seconds
+DNS_TTL = 60.0
+# Upper bound on cached hostnames; the oldest entry is dropped first
+DNS_CACHE_SIZE = 1024
+# Request targets starting with these are absolute-form URIs
+ABSOLUTE_PREFIXES = ("http://", "https://")
+# ASCII case-folding table for header names, applied before decoding
+HEADER_LOWER = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+
+# Fixed replies sent by the proxy itself
+_RESP_400 = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n"
+_RESP_403 = b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n"
+_RESP_502 = b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n"
+_RESP_CONNECTED = b"HTTP/1.1 200 Connection Established\r\n\r\n"
+# SO_LINGER on with a zero timeout: close() sends RST and skips TIME_WAIT
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
 
 class HTTPRequest:
     """Parsed HTTP/1.x request (single exchange)."""
 
-    __slots__ = ("raw", "method", "path", "version", "headers", "body", "client")
+    __slots__ = (
+        "raw",
+        "method",
+        "path",
+        "version",
+        "headers",
+        "body",
+        "client",
+        "host_lc",
+        "port",
+        "raw_headers",
+        "dirty",
+    )
 
     def __init__(
         self,
@@ -57,6 +110,7 @@ class HTTPRequest:
         headers: Dict[str, str],
         body: bytes,
         client: Tuple[str, int],
+        raw_headers: Optional[bytes] = None,
     ):
         self.raw = raw
         self.method = method
@@ -65,11 +119,188 @@ class HTTPRequest:
         self.headers = headers
         self.body = body
         self.client = client
+        # Header block as received (after the request line, including the
+        # terminating blank line), forwarded upstream verbatim.
+        self.raw_headers = raw_headers
+        # Lowercased hostname and port from the Host header, or None.
+        # Computed once here so plugins need not re-parse it.  A
+        # malformed host or port raises ValueError.
+        host_header = headers.get("host")
+        if host_header:
+            authority = urlsplit(f"//{host_header}")
+            self.host_lc = authority.hostname
+            self.port = authority.port
+        else:
+            self.host_lc = None
+            self.port = None
+        # Plugins that change method, path, version, headers or body set
+        # this so the request is re-serialised instead of forwarded as is.
+        self.dirty = False
 
     def header(self, name: str) -> Optional[str]:
         return self.headers.get(name.lower())
 
 
+_RequestHead = Tuple[str, str, str, Dict[str, str]]
+
+
+def _parse_head_bytes(header_data: bytes) -> Optional[_RequestHead]:
+    """Split a request head into method, target, version and headers."""
+    # Work on the raw bytes and decode only what is kept; the block
+    # ends in two empty lines, which are skipped.
+    lines = header_data.split(b"\r\n")
+
+    # Parse request line
+    parts = lines[0].split()
+
+    if len(parts) != 3:
+        return None
+
+    method, path, version = (part.decode("latin-1") for part in parts)
+
+    # Parse headers
+    headers: Dict[str, str] = {}
+
+    for line in lines[1:-2]:
+        name, sep, value = line.partition(b":")
+        if not sep:
+            continue
+        headers[name.translate(HEADER_LOWER).strip().decode("latin-1")] = value.strip().decode("latin-1")
+
+    return method, path, version, headers
+
+
+class _HeadCollector:
+    """httptools callback target gathering the request target and headers."""
+
+    __slots__ = ("url", "headers")
+
+    def __init__(self) -> None:
+        self.url = b""
+        self.headers: Dict[str, str] = {}
+
+    def on_url(self, url: bytes) -> None:
+        self.url += url
+
+    def on_header(self, name: bytes, value: bytes) -> None:
+        self.headers[name.translate(HEADER_LOWER).decode("latin-1")] = value.strip().decode("latin-1")
+
+
+def _parse_head_httptools(header_data: bytes) -> Optional[_RequestHead]:
+    """Same as ``_parse_head_bytes`` but tokenised by llhttp.
+
+    Only the head is fed to the parser; the body is still read by
+    Content-Length so the raw header block can be forwarded unchanged.
+    """
+    collector = _HeadCollector()
+    parser = httptools.HttpRequestParser(collector)
+    try:
+        parser.feed_data(header_data)
+    except httptools.HttpParserUpgrade:
+        # CONNECT and Upgrade requests stop the parser after the head,
+        # which is all that is needed here.
+        pass
+    except httptools.HttpParserError:
+        return None
+    return (
+        parser.get_method().decode("latin-1"),
+        collector.url.decode("latin-1"),
+        "HTTP/" + parser.get_http_version(),
+        collector.headers,
+    )
+
+
+# Prefer the C parser when httptools is installed
+parse_request_head = _parse_head_httptools if httptools else _parse_head_bytes
+
+
+def _response_status(header_data: bytes) -> int:
+    """Return the status code of a response head, or 0 if unparseable."""
+    status_line = header_data.split(b"\r\n", 1)[0].split(None, 2)
+    return int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+
+
+def _response_framing(header_data: bytes, method: str) -> Tuple[Optional[int], bool, bool]:
+    """Work out how a final upstream response body is delimited.
+
+    Returns ``(content_length, chunked, keep_alive)``.  ``content_length``
+    is ``None`` for chunked bodies and for bodies that run until the
+    upstream closes the connection.
+    """
+    lines = header_data.split(b"\r\n")
+    keep_alive = lines[0].startswith(b"HTTP/1.1 ")
+    status = _response_status(header_data)
+
+    length: Optional[int] = None
+    chunked = False
+    for line in lines[1:-2]:
+        name, sep, value = line.partition(b":")
+        if not sep:
+            continue
+        name = name.strip().translate(HEADER_LOWER)
+        if name == b"content-length":
+            value = value.strip()
+            if value.isdigit():
+                length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = value.translate(HEADER_LOWER).rstrip().endswith(b"chunked")
+        elif name == b"connection":
+            keep_alive = keep_alive and b"close" not in value.translate(HEADER_LOWER)
+
+    if 100 <= status < 200:
+        # Interim heads are consumed by handle_client; never pool after one
+        return 0, False, False
+    if method == "HEAD" or status in (204, 304):
+        return 0, False, keep_alive
+    if chunked:
+        return None, True, keep_alive
+    return length, False, keep_alive
+
+
+def _has_buffered(reader: asyncio.StreamReader) -> bool:
+    """Whether unread bytes sit in ``reader``.
+
+    Bytes left over after a complete exchange belong to no request, so a
+    connection holding any must not be handed to the next client.
+    StreamReader exposes no public accessor for its buffer.
+    """
+    return bool(reader._buffer)
+
+
+async def _body_exact(reader: asyncio.StreamReader, length: int):
+    """Yield exactly ``length`` body bytes in pieces of at most CHUNK_SIZE."""
+    remaining = length
+    while remaining:
+        chunk = await reader.read(min(remaining, CHUNK_SIZE))
+        if not chunk:
+            raise asyncio.IncompleteReadError(b"", remaining)
+        remaining -= len(chunk)
+        yield chunk
+
+
+async def _body_chunked(reader: asyncio.StreamReader):
+    """Yield a chunked body as raw wire bytes, stopping after the trailers."""
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        yield size_line
+        size = int(size_line.split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            while True:
+                trailer = await reader.readuntil(b"\r\n")
+                yield trailer
+                if trailer == b"\r\n":
+                    return
+        # Chunk data plus its terminating CRLF
+        async for chunk in _body_exact(reader, size + 2):
+            yield chunk
+
+
+async def _body_until_eof(reader: asyncio.StreamReader):
+    """Yield body bytes until the upstream closes the connection."""
+    while chunk := await reader.read(CHUNK_SIZE):
+        yield chunk
+
+
 class ProxyServer:
     def __init__(self, listen_host: str, listen_port: int, plugins_dir: Optional[str] = None) -> None:
         self.listen_host = listen_host
@@ -79,13 +310,13 @@ class ProxyServer:
         if plugins_dir:
             self.manager.load_external_plugins(plugins_dir)
 
-        # upstream connection pool: (ip, port) -> list[(reader, writer)]
-        self._pool: dict[tuple[str, int], list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
-        # DNS cache: host -> (ip, expiry)
-        self._dns: dict[str, tuple[str, float]] = {}
-
-        if uvloop:
-            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        # upstream connection pool: (host, port) -> idle (reader, writer, expiry timer)
+        self._pool: dict[
+            tuple[str, int],
+            list[tuple[asyncio.StreamReader, asyncio.StreamWriter, asyncio.TimerHandle]],
+        ] = {}
+        # DNS cache: host -> (addresses, expiry)
+        self._dns: dict[str, tuple[list[str], float]] = {}
 
     async def handle_client(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
@@ -96,25 +327,18 @@ class ProxyServer:
             request = await self.read_http_request(reader, addr)
         except asyncio.IncompleteReadError:
             writer.close()
-            await writer.wait_closed()
             return
 
         if request is None:
             # Invalid request
-            writer.close()
-            await writer.wait_closed()
+            self._reset(writer)
             return
 
         # Pass request through plugins
         allowed = self.manager.process_request(request)
         if not allowed:
             # Denied by a plugin
-            resp = b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n"
-            writer.write(resp)
-            await writer.drain()
-
-            writer.close()
-            await writer.wait_closed()
+            self._close_with(writer, _RESP_403)
             return
 
         # HTTPS & generic‐TCP tunnelling via CONNECT
@@ -125,110 +349,264 @@ class ProxyServer:
         # Determine upstream host and port
         host_header = request.header("host")
         if not host_header:
-            resp = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n"
-            writer.write(resp)
-            await writer.drain()
-
-            writer.close()
-            await writer.wait_closed()
+            self._close_with(writer, _RESP_400)
             return
 
-        upstream_host, upstream_port = self.parse_host(host_header)
-
+        if request.dirty:
+            # A plugin may have rewritten the Host header
+            upstream_key = self.parse_host(host_header)
+        else:
+            upstream_key = (request.host_lc or host_header, request.port or 80)
+
+        if not request.dirty and request.raw_headers is not None:
+            if request.path.startswith(ABSOLUTE_PREFIXES):
+                # Splice the original header block behind a request line
+                # rewritten to origin-form (scheme and host removed).
+                path = self.extract_path(request.path)
+                request_line = f"{request.method} {path} {request.version}\r\n".encode("latin-1")
+                header_bytes, body = request_line + request.raw_headers, request.body
+            else:
+                # Untouched origin-form request: forward it as received
+                header_bytes, body = request.raw, b""
+        else:
+            path = self.extract_path(request.path)
+            request_line = f"{request.method} {path} {request.version}\r\n".encode("latin-1")
+            lines = [f"{key}: {value}" for key, value in request.headers.items()]
+            header_bytes = request_line + "\r\n".join(lines + ["", ""]).encode("latin-1")
+            body = request.body
+
+        # 1) Send the request and read just the response headers (up to \r\n\r\n)
         try:
-            upstream_reader, upstream_writer = await asyncio.open_connection(
-                upstream_host, upstream_port
+            upstream_reader, upstream_writer, header_data = await self._exchange_head(
+                upstream_key, header_bytes, body
             )
         except Exception:
-            resp = b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n"
-            writer.write(resp)
-            await writer.drain()
+            self._close_with(writer, _RESP_502)
+            return
 
+        # 2) Relay interim responses (100 Continue, 102 Processing,
+        # 103 Early Hints) and read on to the final response head
+        try:
+            status = _response_status(header_data)
+            while 100 <= status < 200 and status != 101:
+                writer.write(header_data)
+                header_data = await upstream_reader.readuntil(b"\r\n\r\n")
+                status = _response_status(header_data)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            upstream_writer.close()
             writer.close()
-            await writer.wait_closed()
             return
 
-        # Prepare request line for upstream (remove scheme and host from absolute URI)
-        path = self.extract_path(request.path)
-
-        # Reconstruct request header lines
-        lines = [f"{request.method} {path} {request.version}"]
-        for key, value in request.headers.items():
-            # Use original case if available (not preserved here).  Lowercase keys suffice.
-            lines.append(f"{key}: {value}")
-
-        header_bytes = "\r\n".join(lines).encode("latin-1") + b"\r\n\r\n"
-        body = request.body
-
-        upstream_writer.write(header_bytes + body)
-        await upstream_writer.drain()
-
-        # 1) Read just the response headers (up to \r\n\r\n)
-        header_data = await upstream_reader.readuntil(b"\r\n\r\n")
-        writer.write(header_data)
-        await writer.drain()
-
-        # 2) If this is a WebSocket handshake (101 + Upgrade: websocket), tunnel raw bytes
-        first_line = header_data.split(b"\r\n", 1)[0]
-        if b"101" in first_line and b"upgrade: websocket" in header_data.lower():
+        # 3) Switching Protocols (WebSocket, h2c, ...): the connection no
+        # longer speaks HTTP/1.1, so tunnel raw bytes and never pool it
+        if status == 101:
+            writer.write(header_data)
+            await writer.drain()
             await self.pipe_bidirectional(
                 reader, writer, upstream_reader, upstream_writer
             )
             return
 
-        # 3) Otherwise read the rest of the HTTP body and run it through plugins
-        body_data = await upstream_reader.read(-1)
-        full_response = header_data + body_data
-        processed = self.manager.process_response(full_response, request)
-        writer.write(processed)
-        await writer.drain()
+        # 4) Read exactly the response body so the upstream connection
+        # can be reused once the exchange is complete
+        length, chunked, reusable = _response_framing(header_data, request.method)
+        if chunked:
+            body = _body_chunked(upstream_reader)
+        elif length is not None:
+            body = _body_exact(upstream_reader, length)
+        else:
+            body = _body_until_eof(upstream_reader)
+            reusable = False
+        reusable = reusable and self._request_keeps_alive(request)
 
-        # 4) Teardown
-        upstream_writer.close()
+        try:
+            if self.manager.has_response_hooks():
+                # 4a) Plugins see the complete response, so buffer it
+                body_data = b"".join([chunk async for chunk in body])
+                full_response = header_data + body_data
+                processed = self.manager.process_response(full_response, request)
+                writer.write(processed)
+                await writer.drain()
+            else:
+                # 4b) Nobody inspects the response: stream it through in
+                # fixed-size chunks so memory stays constant for large bodies
+                writer.write(header_data)
+                async for chunk in body:
+                    writer.write(chunk)
+                    await writer.drain()
+                await writer.drain()
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            # Upstream or client went away mid-body
+            reusable = False
+
+        # 5) Teardown
+        if reusable:
+            self._release(upstream_key, upstream_reader, upstream_writer)
+        else:
+            upstream_writer.close()
         writer.close()
-        await upstream_writer.wait_closed()
+        if not reusable:
+            await upstream_writer.wait_closed()
         await writer.wait_closed()
 
+    @staticmethod
+    def _request_keeps_alive(request: HTTPRequest) -> bool:
+        # The client's header block is forwarded verbatim, so upstream sees
+        # its Connection header; chunked request bodies are not relayed.
+        if request.version != "HTTP/1.1" or "transfer-encoding" in request.headers:
+            return False
+        return "close" not in request.headers.get("connection", "").lower()
+
+    async def _exchange_head(
+        self, key: Tuple[str, int], head: bytes, body: bytes
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bytes]:
+        """Send a request upstream and return the connection and response head.
+
+        An idle pooled connection is tried first.  If the upstream closed
+        it without answering, the request is retried once on a fresh
+        connection.  A connection that fails is closed before the error
+        propagates.
+        """
+        conn = self._acquire(key)
+        if conn is not None:
+            reader, writer = conn
+            try:
+                writer.writelines((head, body))
+                await writer.drain()
+                return reader, writer, await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError as exc:
+                writer.close()
+                if exc.partial:
+                    raise
+            except OSError:
+                writer.close()
+            except BaseException:
+                writer.close()
+                raise
+
+        reader, writer = await self._connect(*key)
+        try:
+            # writelines hands both buffers to the transport without first
+            # concatenating them, so large bodies are not copied
+            writer.writelines((head, body))
+            await writer.drain()
+            return reader, writer, await reader.readuntil(b"\r\n\r\n")
+        except BaseException:
+            writer.close()
+            raise
+
+    async def _resolve(self, host: str) -> list[str]:
+        """Return the addresses of ``host``, cached for ``DNS_TTL`` seconds."""
+        now = time.monotonic()
+        hit = self._dns.get(host)
+        if hit is not None and hit[1] > now:
+            return hit[0]
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if hit is None and len(self._dns) >= DNS_CACHE_SIZE:
+            del self._dns[next(iter(self._dns))]
+        self._dns[host] = (addresses, now + DNS_TTL)
+        return addresses
+
+    async def _connect(
+        self, host: str, port: int
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a connection to ``host`` using cached DNS results.
+
+        Addresses are tried in resolver order until one accepts.
+        """
+        error: Optional[OSError] = None
+        for address in await self._resolve(host):
+            try:
+                return await asyncio.open_connection(address, port)
+            except OSError as exc:
+                error = exc
+        raise error or OSError(f"No addresses for {host}")
+
+    def _acquire(
+        self, key: Tuple[str, int]
+    ) -> Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+        """Pop the most recently used live idle connection to ``key``."""
+        idle = self._pool.get(key)
+        while idle:
+            reader, writer, timer = idle.pop()
+            timer.cancel()
+            if not idle:
+                del self._pool[key]
+            if not reader.at_eof() and not writer.is_closing() and not _has_buffered(reader):
+                return reader, writer
+            writer.close()
+        return None
+
+    def _release(
+        self, key: Tuple[str, int], reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Return a connection to the pool, closing it once it sits idle too long."""
+        idle = self._pool.get(key, [])
+        if len(idle) >= UPSTREAM_MAX_IDLE or _has_buffered(reader):
+            writer.close()
+            return
+        self._pool[key] = idle
+
+        def expire() -> None:
+            try:
+                idle.remove(entry)
+            except ValueError:
+                return
+            writer.close()
+            if not idle and self._pool.get(key) is idle:
+                del self._pool[key]
+
+        timer = asyncio.get_running_loop().call_later(UPSTREAM_IDLE_TIMEOUT, expire)
+        entry = (reader, writer, timer)
+        idle.append(entry)
+
+    def _close_pool(self) -> None:
+        for idle in self._pool.values():
+            for _, writer, timer in idle:
+                timer.cancel()
+                writer.close()
+        self._pool.clear()
+
+    @staticmethod
+    def _close_with(writer: asyncio.StreamWriter, resp: bytes) -> None:
+        """Send a final reply and close the client connection.
+
+        The transport flushes ``resp`` before closing; nothing waits for
+        the peer, so rejected clients cannot hold the handler open.
+        """
+        writer.write(resp)
+        writer.close()
+
+    @staticmethod
+    def _reset(writer: asyncio.StreamWriter) -> None:
+        """Drop a misbehaving client with an RST instead of a graceful close."""
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+            except OSError:
+                pass
+        writer.transport.abort()
+
     async def read_http_request(
         self, reader: asyncio.StreamReader, addr: Tuple[str, int]
     ) -> Optional[HTTPRequest]:
-        # Read header until blank line
+        # Read header until blank line; oversized or slow heads are rejected
         try:
-            header_data = await reader.readuntil(b"\r\n\r\n")
+            async with asyncio.timeout(HEADER_TIMEOUT):
+                header_data = await reader.readuntil(b"\r\n\r\n")
         except asyncio.LimitOverrunError:
             return None
         except asyncio.IncompleteReadError:
             return None
-
-        # Decode header lines
-        try:
-            header_text = header_data.decode("latin-1")
-        except UnicodeDecodeError:
-            return None
-
-        lines = header_text.split("\r\n")
-        if not lines:
+        except TimeoutError:
             return None
 
-        # Parse request line
-        request_line = lines[0]
-        parts = request_line.split()
-
-        if len(parts) != 3:
+        head = parse_request_head(header_data)
+        if head is None:
             return None
-
-        method, path, version = parts
-
-        # Parse headers
-        headers: Dict[str, str] = {}
-
-        for line in lines[1:]:
-            if not line:
-                continue
-            if ":" not in line:
-                continue
-            name, value = line.split(":", 1)
-            headers[name.strip().lower()] = value.strip()
+        method, path, version, headers = head
 
         # Determine body length
         body = b""
@@ -239,15 +617,23 @@ class ProxyServer:
             if length > 0:
                 body = await reader.readexactly(length)
 
-        return HTTPRequest(
-            raw=header_data + body,
-            method=method,
-            path=path,
-            version=version,
-            headers=headers,
-            body=body,
-            client=addr,
-        )
+        first_crlf = header_data.find(b"\r\n") + 2
+
+        try:
+            return HTTPRequest(
+                raw=header_data + body,
+                method=method,
+                path=path,
+                version=version,
+                headers=headers,
+                body=body,
+                client=addr,
+                raw_headers=header_data[first_crlf:],
+            )
+        except ValueError:
+            # Unparseable Host header, e.g. an unterminated IPv6 literal
+            # or a non-numeric port
+            return None
 
     @staticmethod
     def parse_host(host_header: str) -> Tuple[str, int]:
@@ -265,11 +651,12 @@ class ProxyServer:
 
     @staticmethod
     def extract_path(url: str) -> str:
-        # Remove scheme and host from absolute URL to send to upstream
-        m = re.match(r"https?://[^/]+(.*)", url)
-        if m:
-            path = m.group(1)
-            return path or "/"
+        # Remove scheme and host from absolute URL to send to upstream.
+        # The authority starts at index 7 or 8, so the first slash at or
+        # after index 8 ends it.
+        if url.startswith(ABSOLUTE_PREFIXES):
+            slash = url.find("/", 8)
+            return url[slash:] if slash != -1 else "/"
         return url
 
     async def handle_connect_tunnel(
@@ -280,14 +667,12 @@ class ProxyServer:
         port = int(port_str)
 
         try:
-            remote_reader, remote_writer = await asyncio.open_connection(host, port)
+            remote_reader, remote_writer = await self._connect(host, port)
         except:  # noqa
-            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\n\r\n")
-            await client_writer.drain()
-            client_writer.close()
+            self._close_with(client_writer, _RESP_502)
             return
 
-        client_writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        client_writer.write(_RESP_CONNECTED)
         await client_writer.drain()
 
         # tunnel raw bytes both ways
@@ -299,13 +684,16 @@ class ProxyServer:
         """Pump bytes r1→w2 and r2→w1 until one side closes."""
 
         async def pump(src, dst):
+            transport = dst.transport
             try:
                 while True:
-                    chunk = await src.read(4096)
+                    chunk = await src.read(CHUNK_SIZE)
                     if not chunk:
                         break
                     dst.write(chunk)
-                    await dst.drain()
+                    # Apply back-pressure only when the peer falls behind
+                    if transport.get_write_buffer_size() > TUNNEL_HIGH_WATER:
+                        await dst.drain()
             except asyncio.CancelledError:
                 pass
 
@@ -327,7 +715,7 @@ class ProxyServer:
 
     async def run(self) -> None:
         server = await asyncio.start_server(
-            self.handle_client, self.listen_host, self.listen_port
+            self.handle_client, self.listen_host, self.listen_port, limit=HEADER_LIMIT
         )
         # addrs = ", ".join(str(sock.getsockname()) for sock in server.sockets)
 
@@ -341,6 +729,7 @@ class ProxyServer:
             except asyncio.CancelledError:
                 pass
             finally:
+                self._close_pool()
                 # Finalize plugins on shutdown
                 self.manager.finalize_plugins()
 
@@ -359,6 +748,22 @@ def parse_listen(arg: str) -> Tuple[str, int]:
     return host, port
 
 
+def configure_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route log records through a queue to a background writer thread.
+
+    Handlers called from the event loop only enqueue the record, so
+    logging a plugin failure never blocks request handling on stderr.
+    The caller must ``stop()`` the returned listener to flush it.
+    """
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logging.basicConfig(level=level, handlers=[logging.handlers.QueueHandler(records)])
+    listener = logging.handlers.QueueListener(records, stream)
+    listener.start()
+    return listener
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Asynchronous HTTP proxy server")
     parser.add_argument(
@@ -375,12 +780,18 @@ def main() -> None:
     args = parser.parse_args()
     host, port = args.listen
 
+    listener = configure_logging()
     proxy = ProxyServer(host, port, plugins_dir=args.plugins)
 
+    # Run on uvloop when available without touching the global policy
+    loop_factory = uvloop.new_event_loop if uvloop else None
+
     try:
-        asyncio.run(proxy.run())
+        asyncio.run(proxy.run(), loop_factory=loop_factory)
     except KeyboardInterrupt:
         print("Shutting down proxy")
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
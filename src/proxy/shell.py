@@ -3,14 +3,14 @@ shell
 =====
 
 Entry point for the interactive firewall shell.  This script creates
-a `PluginManager`, loads the built‑in plugins (including the
-`FirewallShell`), and then invokes the shell's REPL.  Run this module
+a `PluginManager`, loads the `FirewallShell` plugin together with the
+plugins it depends on, and then invokes the shell's REPL.  Run this module
 to configure the firewall using a familiar Cisco‑style syntax.
 
 Usage:
 
 ```bash
-python -m proxy.shell
+python -m proxy.shell   # or: python -m proxy
 ```
 
 You can optionally specify an external plugins directory via the
@@ -20,42 +20,75 @@ loading.
 
 from __future__ import annotations
 
-import argparse
+import atexit
+import sys
+from typing import List, NoReturn, Optional
 
-from .plugin_manager import PluginManager
+_USAGE = "usage: proxy-shell [-h] [--plugins PLUGINS]\n"
 
+# The shell takes a single option, so the command line is scanned by
+# hand instead of importing and building an argparse parser.
+_STATIC_USAGE = _USAGE + """
+Firewall shell
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Firewall shell")
-    parser.add_argument(
-        "--plugins",
-        type=str,
-        help="Optional path to directory containing external plugins",
-    )
-    args = parser.parse_args()
+options:
+  -h, --help         show this help message and exit
+  --plugins PLUGINS  Optional path to directory containing external plugins
+"""
 
-    manager = PluginManager()
-    manager.load_builtin_plugins()
 
-    if args.plugins:
-        manager.load_external_plugins(args.plugins)
+def _usage_error(message: str) -> NoReturn:
+    sys.stderr.write(f"{_USAGE}proxy-shell: error: {message}\n")
+    sys.exit(2)
+
+
+def _parse_argv(argv: List[str]) -> Optional[str]:
+    """Return the ``--plugins`` directory given in ``argv``, if any.
+
+    ``argv`` excludes the program name.  ``-h``/``--help`` prints the
+    usage and exits; anything else unexpected exits with status 2, as
+    argparse would.
+    """
+    plugins = None
+    unknown: List[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg in ("-h", "--help"):
+            # Runs before main() registers its atexit hook; a normal exit
+            # keeps hooks from earlier in-process calls and embedders intact.
+            sys.stdout.write(_STATIC_USAGE)
+            sys.exit(0)
+        elif arg == "--plugins":
+            plugins = next(args, None)
+            if plugins is None or plugins.startswith("-"):
+                _usage_error("argument --plugins: expected one argument")
+        elif arg.startswith("--plugins="):
+            plugins = arg.partition("=")[2]
+        else:
+            unknown.append(arg)
+    if unknown:
+        _usage_error("unrecognized arguments: " + " ".join(unknown))
+    return plugins
 
-    # Find the FirewallShell plugin
-    shell_plugin = None
-    for plugin in manager.plugins:
-        if plugin.name == "FirewallShell":
-            shell_plugin = plugin
-            break
 
-    if shell_plugin is None:
-        raise RuntimeError("FirewallShell plugin is not loaded")
+def main() -> None:
+    plugins_dir = _parse_argv(sys.argv[1:])
+
+    # Imported only now so --help and usage errors skip the plugin stack
+    from .plugin_manager import PluginManager
+
+    manager = PluginManager()
+    # Load only the shell and the plugins it depends on
+    shell_plugin = manager.load_plugin("FirewallShell")
+    # Finalize plugins however the process ends
+    atexit.register(manager.finalize_plugins)
+
+    if plugins_dir:
+        manager.load_external_plugins(plugins_dir)
 
     # Launch interactive shell
     shell_plugin.start_shell()
 
-    # Finalize plugins when the shell exits
-    manager.finalize_plugins()
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+"""Tests for loading the built-in plugins."""
+
+from __future__ import annotations
+
+import pytest
+
+from proxy import plugins
+from proxy.plugin_manager import PluginManager
+
+
+def test_load_plugin_loads_dependencies_first():
+    manager = PluginManager()
+    manager.load_plugin("FirewallShell")
+    assert [p.name for p in manager.plugins] == ["Firewall", "FirewallConfig", "FirewallShell"]
+    assert manager.load_plugin("Firewall") is manager.plugins[0]
+
+
+def test_builtin_class_provided_twice_is_rejected(monkeypatch):
+    monkeypatch.setitem(plugins.BUILTIN_PLUGINS, "firewall_again", "proxy.plugins.firewall")
+    monkeypatch.setitem(plugins.BUILTIN_MANIFEST, "FirewallAgain", ("firewall_again", ()))
+    monkeypatch.setattr(PluginManager, "_builtin_modules", {})
+    with pytest.raises(ValueError, match="already provided"):
+        PluginManager().load_builtin_plugins()
+    manager = PluginManager()
+    manager.load_plugin("Firewall")
+    with pytest.raises(ValueError, match="already provided"):
+        manager.load_plugin("FirewallAgain")
+
+
+def test_manifest_entry_must_match_its_module(monkeypatch):
+    monkeypatch.setitem(plugins.BUILTIN_MANIFEST, "Wrong", ("firewall", ()))
+    with pytest.raises(ValueError, match="provides Firewall, expected Wrong"):
+        PluginManager().load_plugin("Wrong")
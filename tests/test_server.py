@@ -0,0 +1,40 @@
+"""Tests for the ProxyServer request handlers."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+
+from proxy.server import ProxyServer
+
+
+def test_connect_tunnel_handler_exists():
+    # handle_client dispatches CONNECT to this method
+    assert inspect.iscoroutinefunction(ProxyServer.handle_connect_tunnel)
+
+
+def test_connect_tunnels_bytes_both_ways():
+    async def echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while data := await reader.read(1024):
+            writer.write(data.upper())
+            await writer.drain()
+        writer.close()
+
+    async def run():
+        origin = await asyncio.start_server(echo, "127.0.0.1", 0)
+        origin_port = origin.sockets[0].getsockname()[1]
+        proxy = ProxyServer("127.0.0.1", 0)
+        server = await asyncio.start_server(proxy.handle_client, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", server.sockets[0].getsockname()[1]
+        )
+        writer.write(b"CONNECT 127.0.0.1:%d HTTP/1.1\r\nHost: 127.0.0.1:%d\r\n\r\n" % (origin_port, origin_port))
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+        assert head == b"HTTP/1.1 200 Connection Established\r\n\r\n"
+        writer.write(b"tunnel data")
+        assert await asyncio.wait_for(reader.readexactly(11), 5) == b"TUNNEL DATA"
+        writer.close()
+        server.close()
+        origin.close()
+
+    asyncio.run(run())
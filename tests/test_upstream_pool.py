@@ -0,0 +1,215 @@
+"""Behavioural tests for upstream response framing and connection reuse."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Tuple
+
+from proxy.server import ProxyServer
+
+CHUNKED = b"5\r\nhello\r\n6;x=1\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\n"
+
+
+def _ok(body: bytes, extra: bytes = b"") -> bytes:
+    return b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n%s\r\n" % (len(body), extra) + body
+
+
+class Upstream:
+    """Keep-alive origin server that answers based on the request path."""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.paths: List[str] = []
+        self.server: asyncio.AbstractServer
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    def respond(self, method: str, path: str) -> bytes:
+        body = b"resp-for-" + path.encode()
+        if path == "/post":
+            return b"HTTP/1.1 100 Continue\r\n\r\n" + _ok(body)
+        if path == "/hints":
+            return (
+                b"HTTP/1.1 103 Early Hints\r\nLink: </style.css>; rel=preload\r\n\r\n"
+                + _ok(body)
+            )
+        if path == "/chunked":
+            return b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n" + CHUNKED
+        if path == "/close":
+            return _ok(body, b"Connection: close\r\n")
+        if path == "/extra":
+            # Stray bytes after a complete response
+            return _ok(body) + b"junk"
+        if method == "HEAD":
+            return b"HTTP/1.1 200 OK\r\nContent-Length: 99\r\n\r\n"
+        return _ok(body)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                method, path = head.split(b" ", 2)[:2]
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        await reader.readexactly(int(line.split(b":")[1]))
+                self.paths.append(path.decode())
+                if path == b"/h2c":
+                    writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: h2c\r\n\r\n")
+                    while data := await reader.read(1024):
+                        writer.write(data.upper())
+                    break
+                writer.write(self.respond(method.decode(), path.decode()))
+                await writer.drain()
+                if path == b"/close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+
+async def _fetch(port: int, raw: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    data = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return data
+
+
+def _get(path: str, upstream_port: int, method: str = "GET") -> bytes:
+    return b"%s %s HTTP/1.1\r\nHost: 127.0.0.1:%d\r\n\r\n" % (
+        method.encode(), path.encode(), upstream_port
+    )
+
+
+def _body(response: bytes) -> bytes:
+    return response.split(b"\r\n\r\n", 1)[1]
+
+
+async def _setup() -> Tuple[Upstream, int, ProxyServer, int]:
+    upstream = Upstream()
+    upstream_port = await upstream.start()
+    proxy = ProxyServer("127.0.0.1", 0)
+    server = await asyncio.start_server(proxy.handle_client, "127.0.0.1", 0)
+    return upstream, upstream_port, proxy, server.sockets[0].getsockname()[1]
+
+
+def _pool_sizes(proxy: ProxyServer) -> Dict[Tuple[str, int], int]:
+    return {key: len(idle) for key, idle in proxy._pool.items()}
+
+
+def test_pool_reuses_upstream_connection():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        for path in ("/a", "/b", "/c"):
+            assert _body(await _fetch(pport, _get(path, uport))) == b"resp-for-" + path.encode()
+        assert upstream.connections == 1
+        assert _pool_sizes(proxy) == {("127.0.0.1", uport): 1}
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_100_continue_is_relayed_and_not_leaked():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        post = b"POST /post HTTP/1.1\r\nHost: 127.0.0.1:%d\r\nExpect: 100-continue\r\nContent-Length: 5\r\n\r\nhello" % uport
+        response = await _fetch(pport, post)
+        assert response.startswith(b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK\r\n")
+        assert response.endswith(b"resp-for-/post")
+        # The next client must get its own response, not a leftover one
+        assert _body(await _fetch(pport, _get("/four", uport))) == b"resp-for-/four"
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_103_early_hints_are_relayed_and_not_leaked():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        response = await _fetch(pport, _get("/hints", uport))
+        assert response.startswith(b"HTTP/1.1 103 Early Hints\r\n")
+        assert response.endswith(b"resp-for-/hints")
+        assert _body(await _fetch(pport, _get("/z", uport))) == b"resp-for-/z"
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_chunked_body_is_relayed_whole_and_connection_reused():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        assert _body(await _fetch(pport, _get("/chunked", uport))) == CHUNKED
+        assert _body(await _fetch(pport, _get("/after", uport))) == b"resp-for-/after"
+        assert upstream.connections == 1
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_head_response_has_no_body():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        response = await _fetch(pport, _get("/h", uport, method="HEAD"))
+        assert response == b"HTTP/1.1 200 OK\r\nContent-Length: 99\r\n\r\n"
+        assert _body(await _fetch(pport, _get("/after", uport))) == b"resp-for-/after"
+        assert upstream.connections == 1
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_connection_close_is_not_pooled():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        assert _body(await _fetch(pport, _get("/close", uport))) == b"resp-for-/close"
+        assert _pool_sizes(proxy) == {}
+        assert _body(await _fetch(pport, _get("/next", uport))) == b"resp-for-/next"
+        assert upstream.connections == 2
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_pool_drops_key_once_its_last_connection_is_taken():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        assert _body(await _fetch(pport, _get("/a", uport))) == b"resp-for-/a"
+        assert _pool_sizes(proxy) == {("127.0.0.1", uport): 1}
+        # Reuses the pooled connection, which the origin then closes
+        assert _body(await _fetch(pport, _get("/close", uport))) == b"resp-for-/close"
+        assert upstream.connections == 1
+        assert proxy._pool == {}
+
+    asyncio.run(run())
+
+
+def test_connection_with_leftover_bytes_is_not_reused():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        assert _body(await _fetch(pport, _get("/extra", uport))) == b"resp-for-/extra"
+        assert _body(await _fetch(pport, _get("/next", uport))) == b"resp-for-/next"
+        assert upstream.connections == 2
+        proxy._close_pool()
+
+    asyncio.run(run())
+
+
+def test_switching_protocols_is_tunnelled_not_pooled():
+    async def run():
+        upstream, uport, proxy, pport = await _setup()
+        reader, writer = await asyncio.open_connection("127.0.0.1", pport)
+        writer.write(_get("/h2c", uport))
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+        assert head.startswith(b"HTTP/1.1 101 Switching Protocols\r\n")
+        writer.write(b"frames")
+        assert await asyncio.wait_for(reader.readexactly(6), 5) == b"FRAMES"
+        writer.close()
+        await asyncio.sleep(0.05)
+        assert _pool_sizes(proxy) == {}
+        proxy._close_pool()
+
+    asyncio.run(run())